@@ -2,20 +2,23 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
+from collections import Counter
 from datetime import datetime
+import hashlib
+import heapq
 import io
 import json
+import threading
+import uuid
 
-# Page config
-st.set_page_config(
-    page_title="Internship Selection Platform",
-    page_icon="🎓",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Custom CSS
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main {background-color: #f8f9fa;}
     .stButton>button {
@@ -35,6 +38,25 @@ st.markdown("""
         border-radius: 10px;
         box-shadow: 0 2px 4px rgba(0,0,0,0.1);
     }
+    .metric-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(140px, 1fr));
+        gap: 16px;
+        margin-bottom: 16px;
+    }
+    .metric-label {
+        font-size: 0.875rem;
+        color: #6b7280;
+    }
+    .metric-value {
+        font-size: 2rem;
+        font-weight: 600;
+        color: #1f2937;
+    }
+    .metric-delta {
+        font-size: 0.875rem;
+        color: #065f46;
+    }
     h1 {color: #1f2937;}
     h2 {color: #374151;}
     .stTabs [data-baseweb="tab-list"] {gap: 8px;}
@@ -103,63 +125,297 @@ st.markdown("""
         margin-left: 10px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Page config
+st.set_page_config(
+    page_title="Internship Selection Platform",
+    page_icon="🎓",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+@st.cache_resource
+def custom_css():
+    """Custom stylesheet with whitespace collapsed, built once per process"""
+    return " ".join(CUSTOM_CSS.split())
+
+# Inject CSS on every run; Streamlit removes elements that a run doesn't emit
+st.markdown(custom_css(), unsafe_allow_html=True)
+
+# Session collections that count their mutations, so cached helpers can be keyed
+# on (token, revision) instead of hashing every entry on each rerun
+class VersionedDict(dict):
+    """Dict with a revision counter bumped on every mutation"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # A random token rather than id(), which can be reused across sessions
+        self.token = uuid.uuid4().hex
+        self.rev = 0
+    
+    def __reduce__(self):
+        # Pickle would restore items through __setitem__ before the counter exists
+        return (type(self), (dict(self),))
+
+class VersionedSet(set):
+    """Set with a revision counter bumped on every mutation"""
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.token = uuid.uuid4().hex
+        self.rev = 0
+    
+    def __reduce__(self):
+        # Rebuild through __init__ so copies never share the original's cache key
+        return (type(self), (set(self),))
+
+def _bump_revision(base, name):
+    """Wrap a mutating method of base so it bumps the revision counter"""
+    method = getattr(base, name)
+    def mutator(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self.rev += 1
+        return result
+    mutator.__name__ = name
+    return mutator
+
+for _name in ('__setitem__', '__delitem__', '__ior__', 'pop', 'popitem', 'clear', 'update', 'setdefault'):
+    setattr(VersionedDict, _name, _bump_revision(dict, _name))
+for _name in ('__ior__', '__iand__', '__isub__', '__ixor__', 'add', 'discard', 'remove', 'pop', 'clear',
+              'update', 'difference_update', 'intersection_update', 'symmetric_difference_update'):
+    setattr(VersionedSet, _name, _bump_revision(set, _name))
+
+def _revision_key(value):
+    """Cache hash for a versioned collection"""
+    return value.token, value.rev
+
+VERSIONED_HASH_FUNCS = {VersionedDict: _revision_key, VersionedSet: _revision_key}
 
 # Initialize session state
 if 'df' not in st.session_state:
     st.session_state.df = None
+if 'data_key' not in st.session_state:
+    st.session_state.data_key = None
 if 'shortlisted' not in st.session_state:
-    st.session_state.shortlisted = set()
+    st.session_state.shortlisted = VersionedSet()
 if 'rejected' not in st.session_state:
-    st.session_state.rejected = set()
+    st.session_state.rejected = VersionedSet()
 if 'remarks' not in st.session_state:
     st.session_state.remarks = {}
 if 'contact_status' not in st.session_state:
-    st.session_state.contact_status = {}
+    st.session_state.contact_status = VersionedDict()
 if 'interview_scheduled' not in st.session_state:
-    st.session_state.interview_scheduled = {}
+    st.session_state.interview_scheduled = VersionedDict()
 if 'ratings' not in st.session_state:
-    st.session_state.ratings = {}
+    st.session_state.ratings = VersionedDict()
+if 'table_version' not in st.session_state:
+    st.session_state.table_version = 0
+
+FILTER_COLUMNS = [
+    'Gender',
+    'Your highest qualification',
+    'Which type of internship would you prefer?',
+    'District of Residence',
+    'Hours of internship you can provide'
+]
+
+# Low-cardinality columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = FILTER_COLUMNS + [
+    'Do you have a laptop?',
+    'Do you have a smartphone?'
+]
+
+# Sidebar filter keys and the categorical columns they are matched against
+CATEGORY_FILTERS = {
+    'gender': 'Gender',
+    'qualification': 'Your highest qualification',
+    'internship_type': 'Which type of internship would you prefer?',
+    'laptop': 'Do you have a laptop?',
+    'smartphone': 'Do you have a smartphone?',
+    'district': 'District of Residence',
+    'availability': 'Hours of internship you can provide'
+}
+
+# Columns shown in the Applications table view, with their display labels
+TABLE_COLUMNS = {
+    'Your Full name': 'Name',
+    'Your Email id': 'Email',
+    'Mobile number ': 'Mobile',
+    'Gender': 'Gender',
+    'District of Residence': 'District',
+    'Your highest qualification': 'Qualification',
+    'Hours of internship you can provide': 'Availability'
+}
+
+# Contact statuses offered on candidate cards and in the table view
+CONTACT_OPTIONS = ["Not Contacted", "Called - No Answer", "Called - Interested",
+                   "Called - Not Interested", "Email Sent", "Follow-up Needed"]
+
+# Sort options that only depend on the uploaded data: (column, ascending)
+COLUMN_SORTS = {
+    'Submission Date (Newest)': ('Submission Date', False),
+    'Submission Date (Oldest)': ('Submission Date', True),
+    'Name (A-Z)': ('Your Full name', True),
+    'Name (Z-A)': ('Your Full name', False)
+}
+
+# Application status codes and their labels (indexed by code)
+STATUS_PENDING, STATUS_SHORTLISTED, STATUS_REJECTED = 0, 1, 2
+STATUS_LABELS = ("⏳ Pending", "✅ Shortlisted", "❌ Rejected")
+
+# Arrow-backed strings let str.contains run pyarrow's vectorized substring kernel
+try:
+    SEARCH_DTYPE = pd.StringDtype('pyarrow')
+except ImportError:
+    SEARCH_DTYPE = pd.StringDtype('python')
 
 # Helper functions
-@st.cache_data
-def load_data(file):
-    """Load and parse CSV data"""
+def _optimize(df):
+    """Store low-cardinality columns as categories and downcast integer columns"""
+    df = df.astype(dict.fromkeys(CATEGORICAL_COLUMNS, 'category'))
+    # Floats are left alone: float32 would corrupt 10-digit phone numbers
+    for column in df.select_dtypes('integer').columns:
+        df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+# Parsed uploads kept in the load_data disk cache; the pickles hold applicants'
+# personal details, so older ones are deleted rather than left on disk
+MAX_CACHED_UPLOADS = 4
+
+@st.cache_data(persist='disk', max_entries=MAX_CACHED_UPLOADS, show_spinner="Loading data...")
+def load_data(data_key, _file_bytes):
+    """Load and parse CSV data (cached on disk by the hash of the file content)"""
+    file_bytes = _file_bytes
     try:
-        df = pd.read_csv(file)
-        df['ID'] = range(len(df))
+        try:
+            # Multi-threaded Arrow parser; falls back to the C parser if
+            # pyarrow is missing or rejects the file
+            df = pd.read_csv(io.BytesIO(file_bytes), engine='pyarrow')
+        except (ImportError, ValueError):
+            df = pd.read_csv(io.BytesIO(file_bytes))
+        df = _optimize(df)
+        # IDs double as row positions, so lookups by ID can use .iloc
+        df['ID'] = np.arange(len(df), dtype=np.int32)
         return df
     except Exception as e:
         st.error(f"Error loading file: {str(e)}")
         return None
 
-def calculate_age(age_str):
-    """Calculate age from date string"""
-    try:
-        if pd.isna(age_str) or age_str == '':
-            return None
-        birth_date = pd.to_datetime(age_str, format='%d-%m-%Y', errors='coerce')
-        if pd.isna(birth_date):
-            return None
-        today = datetime.now()
-        age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
-        return age
-    except:
-        return None
+@st.cache_data(max_entries=4)
+def filter_options(_df, data_key):
+    """Sidebar dropdown options for each filter column"""
+    return {
+        col: ['All'] + sorted(_df[col].dropna().unique().tolist())
+        for col in FILTER_COLUMNS
+    }
+
+# Per-upload caches keep the last four uploads (two charted columns each)
+@st.cache_data(max_entries=8)
+def value_counts(_df, data_key, column):
+    """Value counts of a column for the analytics charts"""
+    return _df[column].value_counts()
+
+# Four uploads times the four column sorts
+@st.cache_data(max_entries=16)
+def sort_order(_df, data_key, sort_by):
+    """Row positions of the full dataframe in sorted order"""
+    column, ascending = COLUMN_SORTS[sort_by]
+    # Stable sort, so masking the full order gives the sorted filtered rows
+    return _df[column].sort_values(ascending=ascending, kind='mergesort').index.to_numpy()
+
+# Shared by every session, so only the most recent uploads stay in memory
+@st.cache_resource(max_entries=4)
+def search_view(_df, data_key):
+    """Lowercase string view of the searchable columns, built once per upload"""
+    # cache_resource hands back the same object instead of a pickled copy
+    return {
+        col: _df[col].astype(SEARCH_DTYPE).str.lower()
+        for col in _df.columns if col != 'ID'
+    }
+
+@st.cache_resource
+def cached_uploads():
+    """Data keys in the load_data disk cache (oldest first) and a lock guarding them"""
+    # Pickles left by an earlier server run can't be matched to a key, so start clean
+    load_data.clear()
+    return [], threading.Lock()
+
+def remember_upload(data_key):
+    """Record an upload, deleting the cached parse of the oldest beyond the limit"""
+    # max_entries only bounds the in-memory layer; disk files must be cleared explicitly
+    uploads, lock = cached_uploads()
+    with lock:
+        if data_key in uploads:
+            uploads.remove(data_key)
+        uploads.append(data_key)
+        while len(uploads) > MAX_CACHED_UPLOADS:
+            load_data.clear(uploads.pop(0), None)
+
+def calculate_ages(dates, today):
+    """Calculate ages from a column of date strings (NaN where unparseable)"""
+    birth = pd.to_datetime(dates, format='%d-%m-%Y', errors='coerce')
+    # Encode dates as yyyymmdd; whole years elapsed are the difference // 10000
+    birth_ymd = birth.dt.year * 10000 + birth.dt.month * 100 + birth.dt.day
+    today_ymd = today.year * 10000 + today.month * 100 + today.day
+    return ((today_ymd - birth_ymd) // 10000).to_numpy(dtype=float, na_value=np.nan)
+
+@st.cache_data(max_entries=4)
+def ages_for(_df, data_key, today):
+    """Ages of all candidates, indexed by ID"""
+    return calculate_ages(_df['Your age as on date of application'], today)
+
+def get_ages(df):
+    """Get ages of all candidates as of today"""
+    return ages_for(df, st.session_state.data_key, datetime.now().date())
 
 def get_status(row_id):
     """Get application status"""
     if row_id in st.session_state.shortlisted:
-        return "✅ Shortlisted"
+        return STATUS_LABELS[STATUS_SHORTLISTED]
     elif row_id in st.session_state.rejected:
-        return "❌ Rejected"
+        return STATUS_LABELS[STATUS_REJECTED]
     else:
-        return "⏳ Pending"
+        return STATUS_LABELS[STATUS_PENDING]
+
+def get_candidate(df, row_id):
+    """Get a candidate's row by ID"""
+    return df.iloc[row_id]
+
+def status_codes(n):
+    """Get the status code of every candidate as an array indexed by ID"""
+    codes = np.zeros(n, dtype=np.int8)
+    codes[id_array(st.session_state.rejected)] = STATUS_REJECTED
+    # Shortlisting takes precedence, matching get_status
+    codes[id_array(st.session_state.shortlisted)] = STATUS_SHORTLISTED
+    return codes
+
+def shortlist(ids):
+    """Shortlist candidates, removing them from the rejected set"""
+    st.session_state.shortlisted.update(ids)
+    st.session_state.rejected.difference_update(ids)
+
+def reject(ids):
+    """Reject candidates, removing them from the shortlisted set"""
+    st.session_state.rejected.update(ids)
+    st.session_state.shortlisted.difference_update(ids)
+
+def reset_to_pending(ids):
+    """Move candidates back to pending"""
+    st.session_state.shortlisted.difference_update(ids)
+    st.session_state.rejected.difference_update(ids)
 
 def get_contact_status(row_id):
     """Get contact status"""
     return st.session_state.contact_status.get(row_id, "Not Contacted")
 
+def id_array(ids):
+    """Convert a set or dict of candidate IDs to an integer array"""
+    return np.fromiter(ids, dtype=np.int64, count=len(ids))
+
+def candidates_by_id(df, ids):
+    """Rows for a collection of candidate IDs, in upload order"""
+    # IDs are row positions, so this is an O(K) gather rather than an O(N) isin scan
+    return df.iloc[np.sort(id_array(ids))]
+
 def add_remark(row_id, remark):
     """Add a remark to a candidate"""
     if row_id not in st.session_state.remarks:
@@ -173,85 +429,264 @@ def get_remarks(row_id):
     """Get all remarks for a candidate"""
     return st.session_state.remarks.get(row_id, [])
 
-def apply_filters(df, filters):
-    """Apply all filters to dataframe"""
-    filtered_df = df.copy()
+# Widget callbacks run before the rerun, so every section renders the updated state
+def save_remark(row_id):
+    """Save the remark typed into a candidate card"""
+    remark = st.session_state[f"remark_{row_id}"]
+    if remark.strip():
+        add_remark(row_id, remark)
+        st.toast("Remark saved!")
+
+def set_contact_status(row_id):
+    """Store the contact status picked on a candidate card"""
+    st.session_state.contact_status[row_id] = st.session_state[f"contact_{row_id}"]
+
+def set_rating(row_id):
+    """Store the rating picked on a candidate card"""
+    st.session_state.ratings[row_id] = st.session_state[f"rating_{row_id}"]
+
+def schedule_interview(row_id):
+    """Schedule an interview on the date picked on a candidate card"""
+    st.session_state.interview_scheduled[row_id] = st.session_state[f"interview_{row_id}"].strftime("%Y-%m-%d")
+    st.toast("Interview scheduled!")
+
+def cancel_interview(row_id):
+    """Cancel a candidate's interview"""
+    st.session_state.interview_scheduled.pop(row_id, None)
+
+def bulk_action(action, candidates, message, criteria=None):
+    """Apply a status action to the candidates matching criteria"""
+    if criteria is not None:
+        candidates = candidates[criteria(candidates)]
+    ids = candidates['ID'].tolist()
+    action(ids)
+    st.toast(message.format(len(ids)))
+
+def mark_contacted(ids, status):
+    """Set the same contact status for several candidates"""
+    ids = id_array(ids).tolist()
+    st.session_state.contact_status.update(dict.fromkeys(ids, status))
+    st.toast(f"Updated {len(ids)} candidates!")
+
+def auto_rate(candidates):
+    """Rate candidates by their highest qualification"""
+    rating_map = {
+        'Engineer': 5,
+        'Graduate': 4,
+        'Post Graduate': 5,
+        'Diploma': 3,
+        'Intermediate': 2
+    }
+    qual_ratings = candidates['Your highest qualification'].map(rating_map)
+    mask = qual_ratings.notna()
+    ids = candidates.loc[mask, 'ID'].tolist()
+    st.session_state.ratings.update(zip(ids, qual_ratings[mask].astype(int).tolist()))
+    st.toast(f"Auto-rated {len(ids)} candidates!")
+
+def apply_table_edits(key, row_ids):
+    """Write the cells edited in the Applications table back to the session state"""
+    changed = False
+    for row, changes in st.session_state[key]['edited_rows'].items():
+        row_id = int(row_ids[int(row)])
+        for column, value in changes.items():
+            if column == 'Status':
+                (reset_to_pending, shortlist, reject)[STATUS_LABELS.index(value)]([row_id])
+            elif column == 'Contact':
+                st.session_state.contact_status[row_id] = value
+            elif column == 'Rating':
+                st.session_state.ratings[row_id] = int(value or 0)
+            elif column == 'Interview':
+                if value:
+                    st.session_state.interview_scheduled[row_id] = str(value)[:10]
+                else:
+                    st.session_state.interview_scheduled.pop(row_id, None)
+            else:
+                continue
+            changed = True
+    if changed:
+        # Start a fresh editor so applied edits are never replayed over later changes
+        st.session_state.table_version += 1
+
+def reset_selections():
+    """Clear every shortlist and rejection"""
+    st.session_state.shortlisted = VersionedSet()
+    st.session_state.rejected = VersionedSet()
+    st.toast("All selections reset!")
+
+def category_mask(series, value):
+    """Equality mask for a categorical column, compared on its integer codes"""
+    values = series.array
+    if value not in values.categories:
+        return np.zeros(len(values), dtype=bool)
+    return values.codes == values.categories.get_loc(value)
+
+@st.cache_data(max_entries=32, hash_funcs=VERSIONED_HASH_FUNCS)
+def status_buckets(contact_status):
+    """Split the contact statuses into follow-up and interested IDs"""
+    follow_ups, interested = [], []
+    for id, status in contact_status.items():
+        if 'Follow-up' in status or 'No Answer' in status:
+            follow_ups.append(id)
+        if 'Interested' in status:
+            interested.append(id)
+    return follow_ups, interested
+
+@st.cache_data(max_entries=32, hash_funcs=VERSIONED_HASH_FUNCS)
+def rating_histogram(ratings):
+    """Count ratings by star value (index 0-5)"""
+    counts = Counter(ratings.values())
+    return tuple(counts.get(stars, 0) for stars in range(6))
+
+def filter_mask(df, data_key, filters):
+    """Build a boolean row mask for all filters"""
+    mask = np.ones(len(df), dtype=bool)
+    ids = df['ID'].to_numpy()
     
     # Search filter
     if filters['search']:
-        mask = filtered_df.astype(str).apply(
-            lambda x: x.str.contains(filters['search'], case=False, na=False)
-        ).any(axis=1)
-        filtered_df = filtered_df[mask]
+        term = filters['search'].lower()
+        found = np.zeros(len(df), dtype=bool)
+        for col in search_view(df, data_key).values():
+            found |= col.str.contains(term, regex=False, na=False).to_numpy(dtype=bool)
+        mask &= found
     
     # Categorical filters
-    if filters['gender'] != 'All':
-        filtered_df = filtered_df[filtered_df['Gender'] == filters['gender']]
-    
-    if filters['qualification'] != 'All':
-        filtered_df = filtered_df[filtered_df['Your highest qualification'] == filters['qualification']]
-    
-    if filters['internship_type'] != 'All':
-        filtered_df = filtered_df[filtered_df['Which type of internship would you prefer?'] == filters['internship_type']]
-    
-    if filters['laptop'] != 'All':
-        filtered_df = filtered_df[filtered_df['Do you have a laptop?'] == filters['laptop']]
-    
-    if filters['smartphone'] != 'All':
-        filtered_df = filtered_df[filtered_df['Do you have a smartphone?'] == filters['smartphone']]
-    
-    if filters['district'] != 'All':
-        filtered_df = filtered_df[filtered_df['District of Residence'] == filters['district']]
-    
-    if filters['availability'] != 'All':
-        filtered_df = filtered_df[filtered_df['Hours of internship you can provide'] == filters['availability']]
+    for key, column in CATEGORY_FILTERS.items():
+        if filters[key] != 'All':
+            mask &= category_mask(df[column], filters[key])
     
     # Contact status filter
     if filters['contact_status'] != 'All':
         if filters['contact_status'] == 'Contacted':
-            filtered_df = filtered_df[filtered_df['ID'].isin(st.session_state.contact_status.keys())]
+            mask &= np.isin(ids, id_array(filters['contacted']), assume_unique=True)
         elif filters['contact_status'] == 'Not Contacted':
-            filtered_df = filtered_df[~filtered_df['ID'].isin(st.session_state.contact_status.keys())]
+            mask &= ~np.isin(ids, id_array(filters['contacted']), assume_unique=True)
     
     # Interview filter
     if filters['interview_status'] != 'All':
         if filters['interview_status'] == 'Scheduled':
-            filtered_df = filtered_df[filtered_df['ID'].isin(st.session_state.interview_scheduled.keys())]
+            mask &= np.isin(ids, id_array(filters['interviews']), assume_unique=True)
         elif filters['interview_status'] == 'Not Scheduled':
-            filtered_df = filtered_df[~filtered_df['ID'].isin(st.session_state.interview_scheduled.keys())]
+            mask &= ~np.isin(ids, id_array(filters['interviews']), assume_unique=True)
     
     # Age filter
     if filters['min_age'] or filters['max_age']:
-        filtered_df['Age'] = filtered_df['Your age as on date of application'].apply(calculate_age)
+        ages = ages_for(df, data_key, filters['today'])[ids]
         if filters['min_age']:
-            filtered_df = filtered_df[filtered_df['Age'] >= filters['min_age']]
+            mask &= ages >= filters['min_age']
         if filters['max_age']:
-            filtered_df = filtered_df[filtered_df['Age'] <= filters['max_age']]
+            mask &= ages <= filters['max_age']
     
     # View mode filter
     if filters['view_mode'] == 'Shortlisted':
-        filtered_df = filtered_df[filtered_df['ID'].isin(st.session_state.shortlisted)]
+        mask &= filters['statuses'][ids] == STATUS_SHORTLISTED
     elif filters['view_mode'] == 'Rejected':
-        filtered_df = filtered_df[filtered_df['ID'].isin(st.session_state.rejected)]
+        mask &= filters['statuses'][ids] == STATUS_REJECTED
     elif filters['view_mode'] == 'Pending':
-        filtered_df = filtered_df[
-            ~filtered_df['ID'].isin(st.session_state.shortlisted) & 
-            ~filtered_df['ID'].isin(st.session_state.rejected)
-        ]
+        mask &= filters['statuses'][ids] == STATUS_PENDING
     
-    return filtered_df
+    return mask
+
+@st.cache_data(max_entries=32, hash_funcs=VERSIONED_HASH_FUNCS)
+def filtered_positions(_df, data_key, filters, sort_by, ratings):
+    """Row positions matching the filters, in display order"""
+    mask = filter_mask(_df, data_key, filters)
+    if sort_by in COLUMN_SORTS:
+        # The full sort order is cached per upload and only needs masking
+        order = sort_order(_df, data_key, sort_by)
+    else:
+        # Rating (High-Low)
+        rating_keys = pd.Series(ratings, dtype='int32').reindex(_df['ID'], fill_value=0).to_numpy()
+        order = np.argsort(-rating_keys, kind='stable')
+    return order[mask[order]]
+
+def render_metrics(metrics):
+    """Render (label, value, delta) metrics as a single HTML block"""
+    cards = []
+    for label, value, delta in metrics:
+        delta_html = f'<div class="metric-delta">{delta}</div>' if delta else ''
+        cards.append(
+            f'<div class="metric-card"><div class="metric-label">{label}</div>'
+            f'<div class="metric-value">{value}</div>{delta_html}</div>'
+        )
+    st.markdown(f'<div class="metric-grid">{"".join(cards)}</div>', unsafe_allow_html=True)
+
+def _json_default(value):
+    """Fallback serializer for numpy scalars and timestamps"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+def to_json(data, indent=True):
+    """Serialize data to JSON (indented or compact), using orjson when it is installed"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, default=_json_default, option=option).decode()
+    if indent:
+        return json.dumps(data, indent=2, default=_json_default)
+    return json.dumps(data, separators=(',', ':'), default=_json_default)
+
+def csv_bytes(frame):
+    """Encode a frame as CSV straight into a byte buffer, without a full str copy"""
+    buffer = io.BytesIO()
+    frame.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+# CSV exports are cached on the state they read and returned pre-encoded
+@st.cache_data(max_entries=4)
+def columns_csv(_df, data_key, columns):
+    """CSV of a subset of columns for every candidate"""
+    return csv_bytes(_df[list(columns)])
+
+@st.cache_data(max_entries=4, hash_funcs=VERSIONED_HASH_FUNCS)
+def shortlisted_csv(_df, data_key, shortlisted):
+    """CSV of the shortlisted candidates"""
+    return csv_bytes(candidates_by_id(_df, shortlisted))
+
+@st.cache_data(max_entries=4, hash_funcs=VERSIONED_HASH_FUNCS)
+def interview_csv(_df, data_key, interview_scheduled):
+    """CSV of the candidates with a scheduled interview"""
+    interview_df = candidates_by_id(_df, interview_scheduled)
+    interview_df = interview_df.assign(**{'Interview Date': interview_df['ID'].map(interview_scheduled)})
+    return csv_bytes(interview_df)
+
+@st.cache_data(max_entries=4, hash_funcs=VERSIONED_HASH_FUNCS)
+def offer_letter_csv(_df, data_key, shortlisted, contact_status, ratings, interview_scheduled, selection_date):
+    """CSV of shortlisted candidates with their selection metadata"""
+    shortlisted_candidates = candidates_by_id(_df, shortlisted)
+    ids = shortlisted_candidates['ID']
+    # Add selection metadata; assign builds the new frame without a defensive copy
+    return csv_bytes(shortlisted_candidates.assign(
+        Selection_Date=selection_date,
+        Contact_Status=ids.map(contact_status).fillna('Not Contacted'),
+        Rating=ids.map(ratings).fillna(0).astype('int8'),
+        Interview_Date=ids.map(interview_scheduled).fillna('Not Scheduled')
+    ))
+
+@st.cache_data(max_entries=4, hash_funcs=VERSIONED_HASH_FUNCS)
+def full_report_csv(_df, data_key, statuses, contact_status, ratings, interview_scheduled):
+    """CSV of every candidate with their status, contact, rating and interview"""
+    report_df = _df.copy()
+    # Labels are gathered by status code rather than calling get_status per row
+    report_df['Status'] = np.array(STATUS_LABELS)[statuses]
+    # Dict lookups run inside pandas rather than through a Python lambda per row
+    report_df['Contact_Status'] = report_df['ID'].map(contact_status).fillna('Not Contacted')
+    report_df['Rating'] = report_df['ID'].map(ratings).fillna(0).astype('int8')
+    report_df['Interview_Date'] = report_df['ID'].map(interview_scheduled).fillna('Not Scheduled')
+    return csv_bytes(report_df)
 
 def export_onboarding_package(row_id, df):
     """Export onboarding package for a candidate"""
-    candidate = df[df['ID'] == row_id].iloc[0]
+    candidate = get_candidate(df, row_id)
     remarks = get_remarks(row_id)
+    age = get_ages(df)[row_id]
     
     package = {
         'Personal Information': {
             'Name': candidate['Your Full name'],
             'Email': candidate['Your Email id'],
             'Phone': candidate['Mobile number '],
-            'Age': calculate_age(candidate['Your age as on date of application']),
+            'Age': int(age) if pd.notna(age) else None,
             'Gender': candidate['Gender']
         },
         'Address': {
@@ -288,7 +723,13 @@ def export_onboarding_package(row_id, df):
         }
     }
     
-    return json.dumps(package, indent=2)
+    return package
+
+@st.cache_data(max_entries=4, hash_funcs=VERSIONED_HASH_FUNCS)
+def onboarding_packages_json(_df, data_key, ready_ids, remarks, contact_status, ratings, interview_scheduled):
+    """Compact JSON array with the onboarding package of each ready candidate"""
+    # The session dicts are arguments only so edits to them invalidate the cache
+    return to_json([export_onboarding_package(row_id, _df) for row_id in ready_ids], indent=False)
 
 # Main App
 st.title("🎓 Internship Selection & Onboarding Platform")
@@ -307,12 +748,15 @@ if st.session_state.df is None:
         )
         
         if uploaded_file:
-            with st.spinner("Loading data..."):
-                df = load_data(uploaded_file)
-                if df is not None:
-                    st.session_state.df = df
-                    st.success(f"✅ Successfully loaded {len(df)} applications!")
-                    st.rerun()
+            file_bytes = uploaded_file.getvalue()
+            data_key = hashlib.sha256(file_bytes).hexdigest()
+            remember_upload(data_key)
+            df = load_data(data_key, file_bytes)
+            if df is not None:
+                st.session_state.df = df
+                st.session_state.data_key = data_key
+                st.success(f"✅ Successfully loaded {len(df)} applications!")
+                st.rerun()
 else:
     df = st.session_state.df
     
@@ -327,6 +771,14 @@ else:
             help="Filter by application status"
         )
         
+        # Layout
+        layout = st.radio(
+            "Layout",
+            ['Card view', 'Table view'],
+            horizontal=True,
+            help="Table view shows all results in one scrollable grid"
+        )
+        
         st.markdown("---")
         
         # Search
@@ -341,21 +793,19 @@ else:
         # Interview status filter
         interview_filter = st.selectbox("Interview Status", ['All', 'Scheduled', 'Not Scheduled'])
         
+        options = filter_options(df, st.session_state.data_key)
+        
         # Gender filter
-        gender_options = ['All'] + sorted(df['Gender'].dropna().unique().tolist())
-        gender_filter = st.selectbox("Gender", gender_options)
+        gender_filter = st.selectbox("Gender", options['Gender'])
         
         # Qualification filter
-        qual_options = ['All'] + sorted(df['Your highest qualification'].dropna().unique().tolist())
-        qual_filter = st.selectbox("Qualification", qual_options)
+        qual_filter = st.selectbox("Qualification", options['Your highest qualification'])
         
         # Internship type filter
-        internship_options = ['All'] + sorted(df['Which type of internship would you prefer?'].dropna().unique().tolist())
-        internship_filter = st.selectbox("Internship Type", internship_options)
+        internship_filter = st.selectbox("Internship Type", options['Which type of internship would you prefer?'])
         
         # District filter
-        district_options = ['All'] + sorted(df['District of Residence'].dropna().unique().tolist())
-        district_filter = st.selectbox("District", district_options)
+        district_filter = st.selectbox("District", options['District of Residence'])
         
         # Laptop filter
         laptop_filter = st.selectbox("Has Laptop", ['All', 'Yes', 'No'])
@@ -364,8 +814,7 @@ else:
         smartphone_filter = st.selectbox("Has Smartphone", ['All', 'Yes', 'No'])
         
         # Availability filter
-        avail_options = ['All'] + sorted(df['Hours of internship you can provide'].dropna().unique().tolist())
-        avail_filter = st.selectbox("Availability", avail_options)
+        avail_filter = st.selectbox("Availability", options['Hours of internship you can provide'])
         
         # Age range
         st.markdown("**Age Range**")
@@ -397,12 +846,10 @@ else:
         # Export options
         st.subheader("📥 Export")
         if st.button("Export Shortlisted", width='stretch'):
-            shortlisted_df = df[df['ID'].isin(st.session_state.shortlisted)]
-            if len(shortlisted_df) > 0:
-                csv = shortlisted_df.to_csv(index=False)
+            if st.session_state.shortlisted:
                 st.download_button(
                     "⬇️ Download CSV",
-                    csv,
+                    shortlisted_csv(df, st.session_state.data_key, st.session_state.shortlisted),
                     "shortlisted_candidates.csv",
                     "text/csv",
                     width='stretch'
@@ -411,14 +858,10 @@ else:
                 st.warning("No shortlisted candidates")
         
         if st.button("Export Interview List", width='stretch'):
-            interview_ids = list(st.session_state.interview_scheduled.keys())
-            if interview_ids:
-                interview_df = df[df['ID'].isin(interview_ids)].copy()
-                interview_df['Interview Date'] = interview_df['ID'].map(st.session_state.interview_scheduled)
-                csv = interview_df.to_csv(index=False)
+            if st.session_state.interview_scheduled:
                 st.download_button(
                     "⬇️ Download CSV",
-                    csv,
+                    interview_csv(df, st.session_state.data_key, st.session_state.interview_scheduled),
                     "interview_schedule.csv",
                     "text/csv",
                     width='stretch'
@@ -427,6 +870,7 @@ else:
                 st.warning("No interviews scheduled")
     
     # Apply filters
+    statuses = status_codes(len(df))
     filters = {
         'search': search_term,
         'gender': gender_filter,
@@ -443,612 +887,569 @@ else:
         'interview_status': interview_filter
     }
     
-    filtered_df = apply_filters(df, filters)
+    # Session-state inputs are only added when a filter reads them, so state
+    # changes that can't affect the result keep hitting the cache
+    if contact_filter != 'All':
+        filters['contacted'] = st.session_state.contact_status
+    if interview_filter != 'All':
+        filters['interviews'] = st.session_state.interview_scheduled
+    if view_mode != 'All Applications':
+        filters['statuses'] = statuses
+    if min_age or max_age:
+        filters['today'] = datetime.now().date()
+    ratings = None if sort_by in COLUMN_SORTS else st.session_state.ratings
     
-    # Apply sorting
-    if 'Newest' in sort_by:
-        filtered_df = filtered_df.sort_values('Submission Date', ascending=False)
-    elif 'Oldest' in sort_by:
-        filtered_df = filtered_df.sort_values('Submission Date', ascending=True)
-    elif 'A-Z' in sort_by:
-        filtered_df = filtered_df.sort_values('Your Full name', ascending=True)
-    elif 'Z-A' in sort_by:
-        filtered_df = filtered_df.sort_values('Your Full name', ascending=False)
-    elif 'Rating' in sort_by:
-        filtered_df['Rating_Sort'] = filtered_df['ID'].map(lambda x: st.session_state.ratings.get(x, 0))
-        filtered_df = filtered_df.sort_values('Rating_Sort', ascending=False)
+    # Filtering and sorting are skipped entirely on reruns that only change the page
+    filtered_ids = filtered_positions(df, st.session_state.data_key, filters, sort_by, ratings)
+    filtered_df = df.iloc[filtered_ids]
     
     # Statistics
     st.markdown("---")
     st.header("📊 Dashboard Overview")
     
-    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    # One counting pass over the status codes (pending, shortlisted, rejected),
+    # shared by the dashboard and the summary report
+    pending, shortlisted, rejected = np.bincount(statuses, minlength=3).tolist()
     
-    with col1:
-        st.metric("Total Applications", len(df))
-    with col2:
-        st.metric("Shortlisted", len(st.session_state.shortlisted), 
-                 delta=f"{len(st.session_state.shortlisted)/len(df)*100:.1f}%")
-    with col3:
-        st.metric("Rejected", len(st.session_state.rejected),
-                 delta=f"{len(st.session_state.rejected)/len(df)*100:.1f}%")
-    with col4:
-        pending = len(df) - len(st.session_state.shortlisted) - len(st.session_state.rejected)
-        st.metric("Pending", pending,
-                 delta=f"{pending/len(df)*100:.1f}%")
-    with col5:
-        st.metric("Contacted", len(st.session_state.contact_status))
-    with col6:
-        st.metric("Interviews", len(st.session_state.interview_scheduled))
+    # One markdown element instead of six st.metric widgets
+    render_metrics([
+        ("Total Applications", len(df), None),
+        ("Shortlisted", shortlisted, f"{shortlisted/len(df)*100:.1f}%"),
+        ("Rejected", rejected, f"{rejected/len(df)*100:.1f}%"),
+        ("Pending", pending, f"{pending/len(df)*100:.1f}%"),
+        ("Contacted", len(st.session_state.contact_status), None),
+        ("Interviews", len(st.session_state.interview_scheduled), None)
+    ])
+    
+    # Contact buckets shared by the Contact Management and Onboarding tabs
+    follow_ups, interested = status_buckets(st.session_state.contact_status)
     
     # Visualizations
     st.markdown("---")
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Analytics", "👥 Applications", "📞 Contact Management", "🎯 Quick Actions", "📋 Onboarding"])
+    # Only the open tab runs its body; switching tabs reruns the app
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["📈 Analytics", "👥 Applications", "📞 Contact Management", "🎯 Quick Actions", "📋 Onboarding"],
+        key="active_tab",
+        on_change="rerun"
+    )
     
     with tab1:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Gender distribution
-            gender_counts = df['Gender'].value_counts()
-            fig_gender = px.pie(
-                values=gender_counts.values,
-                names=gender_counts.index,
-                title="Gender Distribution",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig_gender.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig_gender, use_container_width=True)
+        if tab1.open:
+            col1, col2 = st.columns(2)
             
-            # Contact status
-            contacted = len(st.session_state.contact_status)
-            not_contacted = len(df) - contacted
-            fig_contact = go.Figure(data=[
-                go.Bar(x=['Contacted', 'Not Contacted'], y=[contacted, not_contacted],
-                       marker_color=['#10b981', '#ef4444'])
-            ])
-            fig_contact.update_layout(title="Contact Status", xaxis_title="", yaxis_title="Count")
-            st.plotly_chart(fig_contact, use_container_width=True)
-        
-        with col2:
-            # Qualification distribution
-            qual_counts = df['Your highest qualification'].value_counts()
-            fig_qual = px.bar(
-                x=qual_counts.values,
-                y=qual_counts.index,
-                orientation='h',
-                title="Qualification Distribution",
-                color=qual_counts.values,
-                color_continuous_scale='Blues'
-            )
-            fig_qual.update_layout(showlegend=False, xaxis_title="Count", yaxis_title="")
-            st.plotly_chart(fig_qual, use_container_width=True)
+            with col1:
+                # Gender distribution
+                gender_counts = value_counts(df, st.session_state.data_key, 'Gender')
+                fig_gender = px.pie(
+                    values=gender_counts.values,
+                    names=gender_counts.index,
+                    title="Gender Distribution",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
+                fig_gender.update_traces(textposition='inside', textinfo='percent+label')
+                st.plotly_chart(fig_gender, use_container_width=True)
+                
+                # Contact status
+                contacted = len(st.session_state.contact_status)
+                not_contacted = len(df) - contacted
+                fig_contact = go.Figure(data=[
+                    go.Bar(x=['Contacted', 'Not Contacted'], y=[contacted, not_contacted],
+                           marker_color=['#10b981', '#ef4444'])
+                ])
+                fig_contact.update_layout(title="Contact Status", xaxis_title="", yaxis_title="Count")
+                st.plotly_chart(fig_contact, use_container_width=True)
             
-            # Selection funnel
-            funnel_data = {
-                'Stage': ['Applications', 'Contacted', 'Interview Scheduled', 'Shortlisted'],
-                'Count': [len(df), len(st.session_state.contact_status), 
-                         len(st.session_state.interview_scheduled), len(st.session_state.shortlisted)]
-            }
-            fig_funnel = go.Figure(go.Funnel(
-                y=funnel_data['Stage'],
-                x=funnel_data['Count'],
-                textinfo="value+percent initial"
-            ))
-            fig_funnel.update_layout(title="Recruitment Funnel")
-            st.plotly_chart(fig_funnel, use_container_width=True)
+            with col2:
+                # Qualification distribution
+                qual_counts = value_counts(df, st.session_state.data_key, 'Your highest qualification')
+                fig_qual = px.bar(
+                    x=qual_counts.values,
+                    y=qual_counts.index,
+                    orientation='h',
+                    title="Qualification Distribution",
+                    color=qual_counts.values,
+                    color_continuous_scale='Blues'
+                )
+                fig_qual.update_layout(showlegend=False, xaxis_title="Count", yaxis_title="")
+                st.plotly_chart(fig_qual, use_container_width=True)
+                
+                # Selection funnel
+                funnel_data = {
+                    'Stage': ['Applications', 'Contacted', 'Interview Scheduled', 'Shortlisted'],
+                    'Count': [len(df), len(st.session_state.contact_status), 
+                             len(st.session_state.interview_scheduled), len(st.session_state.shortlisted)]
+                }
+                fig_funnel = go.Figure(go.Funnel(
+                    y=funnel_data['Stage'],
+                    x=funnel_data['Count'],
+                    textinfo="value+percent initial"
+                ))
+                fig_funnel.update_layout(title="Recruitment Funnel")
+                st.plotly_chart(fig_funnel, use_container_width=True)
     
     with tab2:
-        st.subheader(f"Applications ({len(filtered_df)} results)")
-        
-        if len(filtered_df) == 0:
-            st.warning("No applications match the current filters.")
-        else:
-            # Pagination
-            items_per_page = 5
-            total_pages = (len(filtered_df) - 1) // items_per_page + 1
+        if tab2.open:
+            st.subheader(f"Applications ({len(filtered_df)} results)")
             
-            col1, col2, col3 = st.columns([2, 3, 2])
-            with col2:
-                page = st.number_input(
-                    "Page",
-                    min_value=1,
-                    max_value=total_pages,
-                    value=1,
-                    help=f"Total {total_pages} pages"
+            if len(filtered_df) == 0:
+                st.warning("No applications match the current filters.")
+            elif layout == 'Table view':
+                # One editable Arrow-backed grid instead of ~40 widgets per candidate card
+                table_ids = filtered_df['ID']
+                table_df = filtered_df[list(TABLE_COLUMNS)].assign(
+                    Select=False,
+                    Status=np.array(STATUS_LABELS)[statuses[filtered_ids]],
+                    Contact=table_ids.map(st.session_state.contact_status).fillna("Not Contacted"),
+                    Rating=table_ids.map(st.session_state.ratings).fillna(0).astype('int8'),
+                    Interview=pd.to_datetime(table_ids.map(st.session_state.interview_scheduled))
                 )
-            
-            start_idx = (page - 1) * items_per_page
-            end_idx = start_idx + items_per_page
-            page_df = filtered_df.iloc[start_idx:end_idx]
-            
-            for idx, row in page_df.iterrows():
-                row_id = row['ID']
-                status = get_status(row_id)
-                age = calculate_age(row['Your age as on date of application'])
-                contact_status = get_contact_status(row_id)
-                remarks = get_remarks(row_id)
-                rating = st.session_state.ratings.get(row_id, 0)
+                table_key = f"applications_table_{st.session_state.table_version}"
+                edited_df = st.data_editor(
+                    table_df,
+                    width='stretch',
+                    hide_index=True,
+                    column_order=['Select', *TABLE_COLUMNS, 'Status', 'Contact', 'Rating', 'Interview'],
+                    column_config={
+                        **TABLE_COLUMNS,
+                        'Select': st.column_config.CheckboxColumn("Select"),
+                        'Status': st.column_config.SelectboxColumn("Status", options=STATUS_LABELS, required=True),
+                        'Contact': st.column_config.SelectboxColumn("Contact Status", options=CONTACT_OPTIONS, required=True),
+                        'Rating': st.column_config.NumberColumn("Rating", min_value=0, max_value=5, step=1, format="%d ⭐"),
+                        'Interview': st.column_config.DateColumn("Interview Date", min_value=datetime.now().date())
+                    },
+                    disabled=list(TABLE_COLUMNS),
+                    key=table_key,
+                    on_change=apply_table_edits,
+                    args=(table_key, filtered_ids)
+                )
+                selected_ids = filtered_ids[edited_df['Select'].to_numpy()].tolist()
                 
-                # Status color
-                if "Shortlisted" in status:
-                    border_color = "#10b981"
-                elif "Rejected" in status:
-                    border_color = "#ef4444"
-                else:
-                    border_color = "#d1d5db"
+                st.markdown(f"**Selected:** {len(selected_ids)} candidates")
+                action_col1, action_col2, action_col3 = st.columns(3)
                 
-                with st.container():
-                    st.markdown(f"""
-                    <div style="border-left: 5px solid {border_color}; padding-left: 15px; margin-bottom: 20px; background: white; padding: 20px; border-radius: 10px;">
-                    """, unsafe_allow_html=True)
-                    
-                    col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
-                    
-                    with col1:
-                        st.markdown(f"### {row['Your Full name']}")
-                        st.markdown(f"**{status}** | Contact: **{contact_status}**")
-                        st.markdown(f"⭐ Rating: {'⭐' * rating if rating > 0 else 'Not Rated'}")
-                    
-                    with col2:
-                        st.markdown(f"📧 {row['Your Email id']}")
-                        st.markdown(f"📱 {row['Mobile number ']}")
-                        if age:
-                            st.markdown(f"🎂 {age} years | {row['Gender']}")
-                    
-                    with col3:
-                        st.markdown(f"**District:** {row['District of Residence']}")
-                        st.markdown(f"**Qualification:** {row['Your highest qualification']}")
-                        st.markdown(f"💻 Laptop: {row['Do you have a laptop?']} | 📱 Phone: {row['Do you have a smartphone?']}")
-                    
-                    with col4:
-                        st.markdown(f"**Availability:**")
-                        st.markdown(f"{row['Hours of internship you can provide']}")
-                    
-                    # Documents Section
-                    st.markdown("---")
-                    st.markdown("#### 📄 Documents & Resources")
-                    doc_col1, doc_col2, doc_col3 = st.columns(3)
-                    
-                    with doc_col1:
-                        resume_url = row.get('Resume with photo upload', '')
-                        if resume_url and resume_url != 'N/A' and str(resume_url) != 'nan':
-                            st.markdown(f'<a href="{resume_url}" target="_blank" class="document-link">📄 View Resume</a>', unsafe_allow_html=True)
-                        else:
-                            st.markdown("📄 Resume: Not Available")
+                with action_col1:
+                    st.button("✅ Shortlist Selected", disabled=not selected_ids, width='stretch',
+                              on_click=shortlist, args=(selected_ids,))
+                
+                with action_col2:
+                    st.button("❌ Reject Selected", disabled=not selected_ids, width='stretch',
+                              on_click=reject, args=(selected_ids,))
+                
+                with action_col3:
+                    st.button("🔄 Reset Selected to Pending", disabled=not selected_ids, width='stretch',
+                              on_click=reset_to_pending, args=(selected_ids,))
+            else:
+                # Pagination
+                items_per_page = 5
+                total_pages = (len(filtered_df) - 1) // items_per_page + 1
+                
+                col1, col2, col3 = st.columns([2, 3, 2])
+                with col2:
+                    page = st.number_input(
+                        "Page",
+                        min_value=1,
+                        max_value=total_pages,
+                        value=1,
+                        help=f"Total {total_pages} pages"
+                    )
+                
+                start_idx = (page - 1) * items_per_page
+                end_idx = start_idx + items_per_page
+                page_df = filtered_df.iloc[start_idx:end_idx]
+                ages = get_ages(df)
+                
+                for row in page_df.to_dict('records'):
+                    row_id = row['ID']
+                    status = STATUS_LABELS[statuses[row_id]]
+                    age = ages[row_id]
+                    contact_status = get_contact_status(row_id)
+                    remarks = get_remarks(row_id)
+                    rating = st.session_state.ratings.get(row_id, 0)
                     
-                    with doc_col2:
-                        id_proof_url = row.get('Enter a copy of your valid id proof', '')
-                        if id_proof_url and id_proof_url != 'N/A' and str(id_proof_url) != 'nan':
-                            st.markdown(f'<a href="{id_proof_url}" target="_blank" class="document-link">🆔 View ID Proof</a>', unsafe_allow_html=True)
-                        else:
-                            st.markdown("🆔 ID Proof: Not Available")
+                    # Status color
+                    if "Shortlisted" in status:
+                        status_color = "green"
+                    elif "Rejected" in status:
+                        status_color = "red"
+                    else:
+                        status_color = "gray"
                     
-                    with doc_col3:
-                        # Export candidate package
-                        if st.button("📦 Export Package", key=f"export_{row_id}"):
-                            package = export_onboarding_package(row_id, df)
-                            st.download_button(
-                                "⬇️ Download",
-                                package,
-                                f"{row['Your Full name']}_package.json",
-                                "application/json",
-                                key=f"download_{row_id}"
+                    # One bordered container per card; each block of lines is a single markdown element
+                    with st.container(border=True):
+                        col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+                        
+                        with col1:
+                            st.markdown(
+                                f"### {row['Your Full name']}\n"
+                                f"**:{status_color}[{status}]** | Contact: **{contact_status}**\n\n"
+                                f"⭐ Rating: {'⭐' * rating if rating > 0 else 'Not Rated'}"
                             )
-                    
-                    # Remarks Section
-                    st.markdown("---")
-                    st.markdown("#### 💬 Remarks & Notes")
-                    
-                    if remarks:
-                        for remark in remarks[-3:]:  # Show last 3 remarks
-                            st.markdown(f"""
+                        
+                        with col2:
+                            contact_lines = [f"📧 {row['Your Email id']}", f"📱 {row['Mobile number ']}"]
+                            if pd.notna(age):
+                                contact_lines.append(f"🎂 {int(age)} years | {row['Gender']}")
+                            st.markdown("\n\n".join(contact_lines))
+                        
+                        with col3:
+                            st.markdown(
+                                f"**District:** {row['District of Residence']}\n\n"
+                                f"**Qualification:** {row['Your highest qualification']}\n\n"
+                                f"💻 Laptop: {row['Do you have a laptop?']} | 📱 Phone: {row['Do you have a smartphone?']}"
+                            )
+                        
+                        with col4:
+                            st.markdown(f"**Availability:**\n\n{row['Hours of internship you can provide']}")
+                        
+                        # Documents Section
+                        st.markdown("---\n#### 📄 Documents & Resources")
+                        doc_col1, doc_col2, doc_col3 = st.columns(3)
+                        
+                        with doc_col1:
+                            resume_url = row.get('Resume with photo upload', '')
+                            if resume_url and resume_url != 'N/A' and str(resume_url) != 'nan':
+                                st.markdown(f'<a href="{resume_url}" target="_blank" class="document-link">📄 View Resume</a>', unsafe_allow_html=True)
+                            else:
+                                st.markdown("📄 Resume: Not Available")
+                        
+                        with doc_col2:
+                            id_proof_url = row.get('Enter a copy of your valid id proof', '')
+                            if id_proof_url and id_proof_url != 'N/A' and str(id_proof_url) != 'nan':
+                                st.markdown(f'<a href="{id_proof_url}" target="_blank" class="document-link">🆔 View ID Proof</a>', unsafe_allow_html=True)
+                            else:
+                                st.markdown("🆔 ID Proof: Not Available")
+                        
+                        with doc_col3:
+                            # Export candidate package
+                            if st.button("📦 Export Package", key=f"export_{row_id}"):
+                                package = to_json(export_onboarding_package(row_id, df))
+                                st.download_button(
+                                    "⬇️ Download",
+                                    package,
+                                    f"{row['Your Full name']}_package.json",
+                                    "application/json",
+                                    key=f"download_{row_id}"
+                                )
+                        
+                        # Remarks Section
+                        st.markdown("---\n#### 💬 Remarks & Notes")
+                        
+                        if remarks:
+                            for remark in remarks[-3:]:  # Show last 3 remarks
+                                st.markdown(f"""
                             <div class="remarks-box">
                                 <small><strong>{remark['timestamp']}</strong></small><br>
                                 {remark['remark']}
                             </div>
                             """, unsafe_allow_html=True)
-                        if len(remarks) > 3:
-                            with st.expander(f"View all {len(remarks)} remarks"):
-                                for remark in remarks:
-                                    st.markdown(f"**{remark['timestamp']}**: {remark['remark']}")
-                    else:
-                        st.info("No remarks yet. Add your first note below.")
-                    
-                    # Add new remark
-                    remark_col1, remark_col2 = st.columns([4, 1])
-                    with remark_col1:
-                        new_remark = st.text_area(
-                            "Add Remark",
-                            placeholder="E.g., Called candidate - confirmed availability, interested in position...",
-                            key=f"remark_{row_id}",
-                            height=80
-                        )
-                    with remark_col2:
-                        st.markdown("<br>", unsafe_allow_html=True)
-                        if st.button("💾 Save", key=f"save_remark_{row_id}", width='stretch'):
-                            if new_remark.strip():
-                                add_remark(row_id, new_remark)
-                                st.success("Remark saved!")
-                                st.rerun()
-                    
-                    # Expandable full details
-                    with st.expander("📋 View Complete Profile"):
-                        detail_col1, detail_col2 = st.columns(2)
-                        with detail_col1:
-                            st.markdown(f"**Submission Date:** {row['Submission Date']}")
-                            st.markdown(f"**Internship Type:** {row['Which type of internship would you prefer?']}")
-                            st.markdown(f"**Campus:** {row['Name of the campus (Highest qualification) ']}")
-                            st.markdown(f"**Qualifying Year:** {row['Qualifying year']}")
-                            st.markdown(f"**Police Station:** {row['Police station name of your place of residence ']}")
-                            st.markdown(f"**Address:** {row['Full address']}")
+                            if len(remarks) > 3:
+                                with st.expander(f"View all {len(remarks)} remarks"):
+                                    for remark in remarks:
+                                        st.markdown(f"**{remark['timestamp']}**: {remark['remark']}")
+                        else:
+                            st.info("No remarks yet. Add your first note below.")
                         
-                        with detail_col2:
-                            st.markdown(f"**Languages:** {row['Languages you can speak']}")
-                            if pd.notna(row['Have you been referred by any officer? ']):
-                                st.markdown(f"**Referred By:** {row['Have you been referred by any officer? ']}")
-                            if pd.notna(row['Tools and softwares you\'re familiar with']):
-                                st.markdown(f"**Skills/Tools:**")
-                                st.text(row['Tools and softwares you\'re familiar with'])
-                            if pd.notna(row.get('Areas of Interest (only for those applying for Project Based Internships - 4 months).')):
-                                st.markdown(f"**Areas of Interest:**")
-                                st.text(row['Areas of Interest (only for those applying for Project Based Internships - 4 months).'])
-                    
-                    # Action buttons
-                    st.markdown("---")
-                    action_col1, action_col2, action_col3, action_col4, action_col5 = st.columns(5)
-                    
-                    with action_col1:
-                        if st.button("✅ Shortlist", key=f"short_{row_id}", width='stretch'):
-                            st.session_state.shortlisted.add(row_id)
-                            st.session_state.rejected.discard(row_id)
-                            st.rerun()
-                    
-                    with action_col2:
-                        if st.button("❌ Reject", key=f"reject_{row_id}", width='stretch'):
-                            st.session_state.rejected.add(row_id)
-                            st.session_state.shortlisted.discard(row_id)
-                            st.rerun()
-                    
-                    with action_col3:
-                        contact_options = ["Not Contacted", "Called - No Answer", "Called - Interested", 
-                                         "Called - Not Interested", "Email Sent", "Follow-up Needed"]
-                        current_contact = st.session_state.contact_status.get(row_id, "Not Contacted")
-                        new_contact = st.selectbox(
-                            "Contact Status",
-                            contact_options,
-                            index=contact_options.index(current_contact) if current_contact in contact_options else 0,
-                            key=f"contact_{row_id}"
-                        )
-                        if new_contact != current_contact:
-                            st.session_state.contact_status[row_id] = new_contact
-                            st.rerun()
-                    
-                    with action_col4:
-                        new_rating = st.selectbox(
-                            "Rating",
-                            [0, 1, 2, 3, 4, 5],
-                            index=st.session_state.ratings.get(row_id, 0),
-                            format_func=lambda x: "⭐" * x if x > 0 else "No Rating",
-                            key=f"rating_{row_id}"
-                        )
-                        if new_rating != st.session_state.ratings.get(row_id, 0):
-                            st.session_state.ratings[row_id] = new_rating
-                            st.rerun()
-                    
-                    with action_col5:
-                        if row_id not in st.session_state.interview_scheduled:
-                            interview_date = st.date_input(
-                                "Schedule Interview",
-                                key=f"interview_{row_id}",
-                                min_value=datetime.now().date()
+                        # Add new remark
+                        remark_col1, remark_col2 = st.columns([4, 1])
+                        with remark_col1:
+                            st.text_area(
+                                "Add Remark",
+                                placeholder="E.g., Called candidate - confirmed availability, interested in position...",
+                                key=f"remark_{row_id}",
+                                height=80
                             )
-                            if st.button("📅 Schedule", key=f"sched_{row_id}"):
-                                st.session_state.interview_scheduled[row_id] = interview_date.strftime("%Y-%m-%d")
-                                st.success("Interview scheduled!")
-                                st.rerun()
-                        else:
-                            st.markdown(f"**Interview:**")
-                            st.markdown(f"📅 {st.session_state.interview_scheduled[row_id]}")
-                            if st.button("❌ Cancel", key=f"cancel_{row_id}"):
-                                del st.session_state.interview_scheduled[row_id]
-                                st.rerun()
-                    
-                    st.markdown("</div>", unsafe_allow_html=True)
-                    st.markdown("---")
+                        with remark_col2:
+                            st.markdown("<br>", unsafe_allow_html=True)
+                            st.button("💾 Save", key=f"save_remark_{row_id}", width='stretch',
+                                      on_click=save_remark, args=(row_id,))
+                        
+                        # Expandable full details
+                        with st.expander("📋 View Complete Profile"):
+                            detail_col1, detail_col2 = st.columns(2)
+                            with detail_col1:
+                                st.markdown(
+                                    f"**Submission Date:** {row['Submission Date']}\n\n"
+                                    f"**Internship Type:** {row['Which type of internship would you prefer?']}\n\n"
+                                    f"**Campus:** {row['Name of the campus (Highest qualification) ']}\n\n"
+                                    f"**Qualifying Year:** {row['Qualifying year']}\n\n"
+                                    f"**Police Station:** {row['Police station name of your place of residence ']}\n\n"
+                                    f"**Address:** {row['Full address']}"
+                                )
+                            
+                            with detail_col2:
+                                st.markdown(f"**Languages:** {row['Languages you can speak']}")
+                                if pd.notna(row['Have you been referred by any officer? ']):
+                                    st.markdown(f"**Referred By:** {row['Have you been referred by any officer? ']}")
+                                if pd.notna(row['Tools and softwares you\'re familiar with']):
+                                    st.markdown(f"**Skills/Tools:**")
+                                    st.text(row['Tools and softwares you\'re familiar with'])
+                                if pd.notna(row.get('Areas of Interest (only for those applying for Project Based Internships - 4 months).')):
+                                    st.markdown(f"**Areas of Interest:**")
+                                    st.text(row['Areas of Interest (only for those applying for Project Based Internships - 4 months).'])
+                        
+                        # Action buttons
+                        st.markdown("---")
+                        action_col1, action_col2, action_col3, action_col4, action_col5 = st.columns(5)
+                        
+                        with action_col1:
+                            st.button("✅ Shortlist", key=f"short_{row_id}", width='stretch',
+                                      on_click=shortlist, args=([row_id],))
+                        
+                        with action_col2:
+                            st.button("❌ Reject", key=f"reject_{row_id}", width='stretch',
+                                      on_click=reject, args=([row_id],))
+                        
+                        with action_col3:
+                            current_contact = st.session_state.contact_status.get(row_id, "Not Contacted")
+                            # Sync the widget with state that bulk actions may have changed
+                            st.session_state[f"contact_{row_id}"] = current_contact if current_contact in CONTACT_OPTIONS else "Not Contacted"
+                            st.selectbox(
+                                "Contact Status",
+                                CONTACT_OPTIONS,
+                                key=f"contact_{row_id}",
+                                on_change=set_contact_status,
+                                args=(row_id,)
+                            )
+                        
+                        with action_col4:
+                            st.session_state[f"rating_{row_id}"] = st.session_state.ratings.get(row_id, 0)
+                            st.selectbox(
+                                "Rating",
+                                [0, 1, 2, 3, 4, 5],
+                                format_func=lambda x: "⭐" * x if x > 0 else "No Rating",
+                                key=f"rating_{row_id}",
+                                on_change=set_rating,
+                                args=(row_id,)
+                            )
+                        
+                        with action_col5:
+                            if row_id not in st.session_state.interview_scheduled:
+                                st.date_input(
+                                    "Schedule Interview",
+                                    key=f"interview_{row_id}",
+                                    min_value=datetime.now().date()
+                                )
+                                st.button("📅 Schedule", key=f"sched_{row_id}",
+                                          on_click=schedule_interview, args=(row_id,))
+                            else:
+                                st.markdown(f"**Interview:**\n\n📅 {st.session_state.interview_scheduled[row_id]}")
+                                st.button("❌ Cancel", key=f"cancel_{row_id}",
+                                          on_click=cancel_interview, args=(row_id,))
     
     with tab3:
-        st.subheader("📞 Contact Management & Follow-ups")
-        
-        # Contact summary
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown("### Contact Status Summary")
-            if st.session_state.contact_status:
-                contact_df = pd.DataFrame([
-                    {'Status': status, 'Count': list(st.session_state.contact_status.values()).count(status)}
-                    for status in set(st.session_state.contact_status.values())
-                ])
-                st.dataframe(contact_df, use_container_width=True, hide_index=True)
-            else:
-                st.info("No contacts made yet")
-        
-        with col2:
-            st.markdown("### Pending Follow-ups")
-            follow_ups = [id for id, status in st.session_state.contact_status.items() 
-                         if 'Follow-up' in status or 'No Answer' in status]
-            st.metric("Need Follow-up", len(follow_ups))
+        if tab3.open:
+            st.subheader("📞 Contact Management & Follow-ups")
             
-            if follow_ups and st.button("📋 View Follow-up List", width='stretch'):
-                follow_up_df = df[df['ID'].isin(follow_ups)][['Your Full name', 'Your Email id', 'Mobile number ']]
-                st.dataframe(follow_up_df, use_container_width=True, hide_index=True)
-        
-        with col3:
-            st.markdown("### Interested Candidates")
-            interested = [id for id, status in st.session_state.contact_status.items() 
-                         if 'Interested' in status]
-            st.metric("Interested", len(interested))
+            # Contact summary
+            col1, col2, col3 = st.columns(3)
             
-            if interested and st.button("📋 View Interested List", width='stretch'):
-                interested_df = df[df['ID'].isin(interested)][['Your Full name', 'Your Email id', 'Mobile number ']]
-                st.dataframe(interested_df, use_container_width=True, hide_index=True)
-        
-        st.markdown("---")
-        
-        # Quick contact actions
-        st.markdown("### Quick Actions")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### Mark Multiple as Contacted")
-            if st.button("Mark All Shortlisted as 'Email Sent'", width='stretch'):
-                for id in st.session_state.shortlisted:
-                    st.session_state.contact_status[id] = "Email Sent"
-                st.success(f"Updated {len(st.session_state.shortlisted)} candidates!")
-                st.rerun()
+            with col1:
+                st.markdown("### Contact Status Summary")
+                if st.session_state.contact_status:
+                    status_counts = Counter(st.session_state.contact_status.values())
+                    contact_df = pd.DataFrame(status_counts.items(), columns=['Status', 'Count'])
+                    st.dataframe(contact_df, use_container_width=True, hide_index=True)
+                else:
+                    st.info("No contacts made yet")
             
-            if st.button("Mark All Filtered as 'Called - No Answer'", width='stretch'):
-                for idx, row in filtered_df.iterrows():
-                    st.session_state.contact_status[row['ID']] = "Called - No Answer"
-                st.success(f"Updated {len(filtered_df)} candidates!")
-                st.rerun()
-        
-        with col2:
-            st.markdown("#### Export Contact Lists")
-            if st.button("Export All Phone Numbers", width='stretch'):
-                phone_df = df[['Your Full name', 'Mobile number ', 'Alternate Mobile number ']].copy()
-                csv = phone_df.to_csv(index=False)
-                st.download_button(
-                    "⬇️ Download CSV",
-                    csv,
-                    "phone_numbers.csv",
-                    "text/csv",
-                    width='stretch'
-                )
+            with col2:
+                st.markdown("### Pending Follow-ups")
+                st.metric("Need Follow-up", len(follow_ups))
+                
+                if follow_ups and st.button("📋 View Follow-up List", width='stretch'):
+                    follow_up_df = candidates_by_id(df, follow_ups)[['Your Full name', 'Your Email id', 'Mobile number ']]
+                    st.dataframe(follow_up_df, use_container_width=True, hide_index=True)
             
-            if st.button("Export All Emails", width='stretch'):
-                email_df = df[['Your Full name', 'Your Email id']].copy()
-                csv = email_df.to_csv(index=False)
-                st.download_button(
-                    "⬇️ Download CSV",
-                    csv,
-                    "email_list.csv",
-                    "text/csv",
-                    width='stretch'
-                )
-    
-    with tab4:
-        st.subheader("🎯 Quick Selection Actions")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### Auto-Shortlist Criteria")
+            with col3:
+                st.markdown("### Interested Candidates")
+                st.metric("Interested", len(interested))
+                
+                if interested and st.button("📋 View Interested List", width='stretch'):
+                    interested_df = candidates_by_id(df, interested)[['Your Full name', 'Your Email id', 'Mobile number ']]
+                    st.dataframe(interested_df, use_container_width=True, hide_index=True)
             
-            if st.button("✅ Shortlist: Has Laptop + Smartphone", width='stretch'):
-                count = 0
-                for idx, row in filtered_df.iterrows():
-                    if row['Do you have a laptop?'] == 'Yes' and row['Do you have a smartphone?'] == 'Yes':
-                        st.session_state.shortlisted.add(row['ID'])
-                        st.session_state.rejected.discard(row['ID'])
-                        count += 1
-                st.success(f"Auto-shortlisted {count} candidates!")
-                st.rerun()
+            st.markdown("---")
             
-            if st.button("✅ Shortlist: Full-time Available", width='stretch'):
-                count = 0
-                for idx, row in filtered_df.iterrows():
-                    if 'Full' in str(row['Hours of internship you can provide']):
-                        st.session_state.shortlisted.add(row['ID'])
-                        st.session_state.rejected.discard(row['ID'])
-                        count += 1
-                st.success(f"Auto-shortlisted {count} candidates!")
-                st.rerun()
+            # Quick contact actions
+            st.markdown("### Quick Actions")
             
-            if st.button("✅ Shortlist: Graduate/Engineer", width='stretch'):
-                count = 0
-                for idx, row in filtered_df.iterrows():
-                    if row['Your highest qualification'] in ['Graduate', 'Engineer']:
-                        st.session_state.shortlisted.add(row['ID'])
-                        st.session_state.rejected.discard(row['ID'])
-                        count += 1
-                st.success(f"Auto-shortlisted {count} candidates!")
-                st.rerun()
+            col1, col2 = st.columns(2)
             
-            if st.button("✅ Shortlist: Rated 4+ Stars", width='stretch'):
-                count = 0
-                for idx, row in filtered_df.iterrows():
-                    if st.session_state.ratings.get(row['ID'], 0) >= 4:
-                        st.session_state.shortlisted.add(row['ID'])
-                        st.session_state.rejected.discard(row['ID'])
-                        count += 1
-                st.success(f"Auto-shortlisted {count} candidates!")
-                st.rerun()
-        
-        with col2:
-            st.markdown("#### Bulk Actions")
+            with col1:
+                st.markdown("#### Mark Multiple as Contacted")
+                st.button("Mark All Shortlisted as 'Email Sent'", width='stretch',
+                          on_click=mark_contacted, args=(st.session_state.shortlisted, "Email Sent"))
+                
+                st.button("Mark All Filtered as 'Called - No Answer'", width='stretch',
+                          on_click=mark_contacted, args=(filtered_df['ID'], "Called - No Answer"))
             
-            if st.button("✅ Shortlist All Filtered", width='stretch'):
-                for idx, row in filtered_df.iterrows():
-                    st.session_state.shortlisted.add(row['ID'])
-                    st.session_state.rejected.discard(row['ID'])
-                st.success(f"Shortlisted {len(filtered_df)} candidates!")
-                st.rerun()
+            with col2:
+                st.markdown("#### Export Contact Lists")
+                if st.button("Export All Phone Numbers", width='stretch'):
+                    st.download_button(
+                        "⬇️ Download CSV",
+                        columns_csv(df, st.session_state.data_key, ('Your Full name', 'Mobile number ', 'Alternate Mobile number ')),
+                        "phone_numbers.csv",
+                        "text/csv",
+                        width='stretch'
+                    )
+                
+                if st.button("Export All Emails", width='stretch'):
+                    st.download_button(
+                        "⬇️ Download CSV",
+                        columns_csv(df, st.session_state.data_key, ('Your Full name', 'Your Email id')),
+                        "email_list.csv",
+                        "text/csv",
+                        width='stretch'
+                    )
+    
+    with tab4:
+        if tab4.open:
+            st.subheader("🎯 Quick Selection Actions")
             
-            if st.button("❌ Reject All Filtered", width='stretch'):
-                for idx, row in filtered_df.iterrows():
-                    st.session_state.rejected.add(row['ID'])
-                    st.session_state.shortlisted.discard(row['ID'])
-                st.warning(f"Rejected {len(filtered_df)} candidates!")
-                st.rerun()
+            col1, col2 = st.columns(2)
             
-            if st.button("🔄 Reset All Filtered to Pending", width='stretch'):
-                for idx, row in filtered_df.iterrows():
-                    st.session_state.shortlisted.discard(row['ID'])
-                    st.session_state.rejected.discard(row['ID'])
-                st.info(f"Reset {len(filtered_df)} candidates to pending!")
-                st.rerun()
+            with col1:
+                st.markdown("#### Auto-Shortlist Criteria")
+                
+                # Criteria are evaluated in the callback, only when the button is pressed
+                st.button("✅ Shortlist: Has Laptop + Smartphone", width='stretch',
+                          on_click=bulk_action, args=(shortlist, filtered_df, "Auto-shortlisted {} candidates!"),
+                          kwargs={'criteria': lambda c: (c['Do you have a laptop?'] == 'Yes') & (c['Do you have a smartphone?'] == 'Yes')})
+                
+                st.button("✅ Shortlist: Full-time Available", width='stretch',
+                          on_click=bulk_action, args=(shortlist, filtered_df, "Auto-shortlisted {} candidates!"),
+                          kwargs={'criteria': lambda c: c['Hours of internship you can provide'].astype(str).str.contains('Full', regex=False, na=False)})
+                
+                st.button("✅ Shortlist: Graduate/Engineer", width='stretch',
+                          on_click=bulk_action, args=(shortlist, filtered_df, "Auto-shortlisted {} candidates!"),
+                          kwargs={'criteria': lambda c: c['Your highest qualification'].isin(['Graduate', 'Engineer'])})
+                
+                st.button("✅ Shortlist: Rated 4+ Stars", width='stretch',
+                          on_click=bulk_action, args=(shortlist, filtered_df, "Auto-shortlisted {} candidates!"),
+                          kwargs={'criteria': lambda c: c['ID'].isin([id for id, rating in st.session_state.ratings.items() if rating >= 4])})
             
-            if st.button("⭐ Auto-Rate by Qualification", width='stretch'):
-                rating_map = {
-                    'Engineer': 5,
-                    'Graduate': 4,
-                    'Post Graduate': 5,
-                    'Diploma': 3,
-                    'Intermediate': 2
-                }
-                count = 0
-                for idx, row in filtered_df.iterrows():
-                    qual = row['Your highest qualification']
-                    if qual in rating_map:
-                        st.session_state.ratings[row['ID']] = rating_map[qual]
-                        count += 1
-                st.success(f"Auto-rated {count} candidates!")
-                st.rerun()
+            with col2:
+                st.markdown("#### Bulk Actions")
+                
+                st.button("✅ Shortlist All Filtered", width='stretch',
+                          on_click=bulk_action, args=(shortlist, filtered_df, "Shortlisted {} candidates!"))
+                
+                st.button("❌ Reject All Filtered", width='stretch',
+                          on_click=bulk_action, args=(reject, filtered_df, "Rejected {} candidates!"))
+                
+                st.button("🔄 Reset All Filtered to Pending", width='stretch',
+                          on_click=bulk_action, args=(reset_to_pending, filtered_df, "Reset {} candidates to pending!"))
+                
+                st.button("⭐ Auto-Rate by Qualification", width='stretch',
+                          on_click=auto_rate, args=(filtered_df,))
     
     with tab5:
-        st.subheader("📋 Onboarding & Final Selection")
-        
-        # Onboarding pipeline
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown("### Ready for Onboarding")
-            ready_candidates = [id for id in st.session_state.shortlisted 
-                              if id in st.session_state.contact_status 
-                              and 'Interested' in st.session_state.contact_status[id]]
-            st.metric("Candidates Ready", len(ready_candidates))
+        if tab5.open:
+            st.subheader("📋 Onboarding & Final Selection")
+            
+            # Onboarding pipeline
+            col1, col2, col3 = st.columns(3)
             
-            if ready_candidates:
-                if st.button("📋 View Ready Candidates", width='stretch'):
-                    ready_df = df[df['ID'].isin(ready_candidates)][
-                        ['Your Full name', 'Your Email id', 'Mobile number ', 'Your highest qualification']
-                    ]
-                    st.dataframe(ready_df, use_container_width=True, hide_index=True)
+            with col1:
+                st.markdown("### Ready for Onboarding")
+                ready_candidates = [id for id in interested if id in st.session_state.shortlisted]
+                st.metric("Candidates Ready", len(ready_candidates))
                 
-                if st.button("📦 Export Onboarding Package (All)", width='stretch'):
-                    packages = []
-                    for id in ready_candidates:
-                        package = export_onboarding_package(id, df)
-                        packages.append(package)
+                if ready_candidates:
+                    if st.button("📋 View Ready Candidates", width='stretch'):
+                        ready_df = candidates_by_id(df, ready_candidates)[
+                            ['Your Full name', 'Your Email id', 'Mobile number ', 'Your highest qualification']
+                        ]
+                        st.dataframe(ready_df, use_container_width=True, hide_index=True)
                     
-                    combined = "[\n" + ",\n".join(packages) + "\n]"
-                    st.download_button(
-                        "⬇️ Download All Packages",
-                        combined,
-                        "onboarding_packages.json",
-                        "application/json",
-                        width='stretch'
-                    )
-        
-        with col2:
-            st.markdown("### Interview Scheduled")
-            st.metric("Interviews", len(st.session_state.interview_scheduled))
+                    if st.button("📦 Export Onboarding Package (All)", width='stretch'):
+                        combined = onboarding_packages_json(
+                            df, st.session_state.data_key, tuple(ready_candidates), st.session_state.remarks,
+                            st.session_state.contact_status, st.session_state.ratings, st.session_state.interview_scheduled
+                        )
+                        st.download_button(
+                            "⬇️ Download All Packages",
+                            combined,
+                            "onboarding_packages.json",
+                            "application/json",
+                            width='stretch'
+                        )
             
-            if st.session_state.interview_scheduled:
-                interview_list = []
-                for id, date in st.session_state.interview_scheduled.items():
-                    candidate = df[df['ID'] == id].iloc[0]
-                    interview_list.append({
-                        'Name': candidate['Your Full name'],
-                        'Date': date,
-                        'Contact': candidate['Mobile number '],
-                        'Email': candidate['Your Email id']
-                    })
+            with col2:
+                st.markdown("### Interview Scheduled")
+                st.metric("Interviews", len(st.session_state.interview_scheduled))
                 
-                interview_df = pd.DataFrame(interview_list).sort_values('Date')
-                st.dataframe(interview_df, use_container_width=True, hide_index=True)
-        
-        with col3:
-            st.markdown("### Top Rated Candidates")
-            top_rated = sorted(
-                [(id, rating) for id, rating in st.session_state.ratings.items() if rating >= 4],
-                key=lambda x: x[1],
-                reverse=True
-            )[:10]
+                if st.session_state.interview_scheduled:
+                    # IDs are row positions, so the scheduled candidates are gathered in one iloc
+                    interview_ids = list(st.session_state.interview_scheduled)
+                    interview_df = pd.DataFrame({
+                        'Name': df['Your Full name'].iloc[interview_ids].to_numpy(),
+                        'Date': list(st.session_state.interview_scheduled.values()),
+                        'Contact': df['Mobile number '].iloc[interview_ids].to_numpy(),
+                        'Email': df['Your Email id'].iloc[interview_ids].to_numpy()
+                    }).sort_values('Date')
+                    st.dataframe(interview_df, use_container_width=True, hide_index=True)
             
-            if top_rated:
-                top_rated_ids = [id for id, _ in top_rated]
-                top_df = df[df['ID'].isin(top_rated_ids)][['Your Full name', 'Your Email id']]
-                top_df['Rating'] = top_df.index.map(lambda x: st.session_state.ratings.get(x, 0))
-                st.dataframe(top_df, use_container_width=True, hide_index=True)
-            else:
-                st.info("No candidates rated yet")
-        
-        st.markdown("---")
-        
-        # Offer letter generation data
-        st.markdown("### 📄 Offer Letter Data Export")
-        st.info("Export selected candidates' data in format ready for offer letter generation")
-        
-        if st.session_state.shortlisted:
-            offer_col1, offer_col2 = st.columns(2)
+            with col3:
+                st.markdown("### Top Rated Candidates")
+                top_rated = heapq.nlargest(
+                    10,
+                    ((id, rating) for id, rating in st.session_state.ratings.items() if rating >= 4),
+                    key=lambda x: x[1]
+                )
+                
+                if top_rated:
+                    top_rated_ids, top_ratings = zip(*top_rated)
+                    # IDs are row positions; gathering them directly keeps the ranking order
+                    top_df = df.iloc[list(top_rated_ids)][['Your Full name', 'Your Email id']].assign(Rating=list(top_ratings))
+                    st.dataframe(top_df, use_container_width=True, hide_index=True)
+                else:
+                    st.info("No candidates rated yet")
             
-            with offer_col1:
-                if st.button("Generate Offer Letter Data (Shortlisted)", width='stretch'):
-                    shortlisted_candidates = df[df['ID'].isin(st.session_state.shortlisted)].copy()
-                    
-                    # Add selection metadata
-                    shortlisted_candidates['Selection_Date'] = datetime.now().strftime("%Y-%m-%d")
-                    shortlisted_candidates['Contact_Status'] = shortlisted_candidates['ID'].map(
-                        lambda x: st.session_state.contact_status.get(x, 'Not Contacted')
-                    )
-                    shortlisted_candidates['Rating'] = shortlisted_candidates['ID'].map(
-                        lambda x: st.session_state.ratings.get(x, 0)
-                    )
-                    shortlisted_candidates['Interview_Date'] = shortlisted_candidates['ID'].map(
-                        lambda x: st.session_state.interview_scheduled.get(x, 'Not Scheduled')
-                    )
-                    
-                    csv = shortlisted_candidates.to_csv(index=False)
-                    st.download_button(
-                        "⬇️ Download Offer Data",
-                        csv,
-                        "offer_letter_data.csv",
-                        "text/csv",
-                        width='stretch'
-                    )
+            st.markdown("---")
+            
+            # Offer letter generation data
+            st.markdown("### 📄 Offer Letter Data Export")
+            st.info("Export selected candidates' data in format ready for offer letter generation")
             
-            with offer_col2:
-                if st.button("Generate Summary Report", width='stretch'):
-                    report = f"""
+            if st.session_state.shortlisted:
+                offer_col1, offer_col2 = st.columns(2)
+                
+                with offer_col1:
+                    if st.button("Generate Offer Letter Data (Shortlisted)", width='stretch'):
+                        csv = offer_letter_csv(
+                            df, st.session_state.data_key, st.session_state.shortlisted,
+                            st.session_state.contact_status, st.session_state.ratings,
+                            st.session_state.interview_scheduled, datetime.now().strftime("%Y-%m-%d")
+                        )
+                        st.download_button(
+                            "⬇️ Download Offer Data",
+                            csv,
+                            "offer_letter_data.csv",
+                            "text/csv",
+                            width='stretch'
+                        )
+                
+                with offer_col2:
+                    if st.button("Generate Summary Report", width='stretch'):
+                        rating_counts = rating_histogram(st.session_state.ratings)
+                        report = f"""
 INTERNSHIP RECRUITMENT SUMMARY REPORT
 Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 
 OVERVIEW
 ========
 Total Applications: {len(df)}
-Shortlisted: {len(st.session_state.shortlisted)}
-Rejected: {len(st.session_state.rejected)}
-Pending Review: {len(df) - len(st.session_state.shortlisted) - len(st.session_state.rejected)}
+Shortlisted: {shortlisted}
+Rejected: {rejected}
+Pending Review: {pending}
 
 CONTACT STATISTICS
 ==================
 Total Contacted: {len(st.session_state.contact_status)}
-Interested Candidates: {len([id for id, s in st.session_state.contact_status.items() if 'Interested' in s])}
-Follow-ups Needed: {len([id for id, s in st.session_state.contact_status.items() if 'Follow-up' in s or 'No Answer' in s])}
+Interested Candidates: {len(interested)}
+Follow-ups Needed: {len(follow_ups)}
 
 INTERVIEW STATISTICS
 ====================
@@ -1056,35 +1457,31 @@ Interviews Scheduled: {len(st.session_state.interview_scheduled)}
 
 RATINGS DISTRIBUTION
 ====================
-5 Stars: {len([r for r in st.session_state.ratings.values() if r == 5])}
-4 Stars: {len([r for r in st.session_state.ratings.values() if r == 4])}
-3 Stars: {len([r for r in st.session_state.ratings.values() if r == 3])}
-2 Stars: {len([r for r in st.session_state.ratings.values() if r == 2])}
-1 Star: {len([r for r in st.session_state.ratings.values() if r == 1])}
+5 Stars: {rating_counts[5]}
+4 Stars: {rating_counts[4]}
+3 Stars: {rating_counts[3]}
+2 Stars: {rating_counts[2]}
+1 Star: {rating_counts[1]}
 
 READY FOR ONBOARDING
 =====================
-Candidates Ready: {len([id for id in st.session_state.shortlisted if id in st.session_state.contact_status and 'Interested' in st.session_state.contact_status[id]])}
+Candidates Ready: {len(ready_candidates)}
                     """
-                    
-                    st.download_button(
-                        "⬇️ Download Report",
-                        report,
-                        "recruitment_summary.txt",
-                        "text/plain",
-                        width='stretch'
-                    )
+                        
+                        st.download_button(
+                            "⬇️ Download Report",
+                            report,
+                            "recruitment_summary.txt",
+                            "text/plain",
+                            width='stretch'
+                        )
     
     # Footer
     st.markdown("---")
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        if st.button("🔄 Reset All Selections", width='stretch'):
-            st.session_state.shortlisted = set()
-            st.session_state.rejected = set()
-            st.success("All selections reset!")
-            st.rerun()
+        st.button("🔄 Reset All Selections", width='stretch', on_click=reset_selections)
     
     with col2:
         if st.button("💾 Save Progress", width='stretch'):
@@ -1100,7 +1497,7 @@ Candidates Ready: {len([id for id in st.session_state.shortlisted if id in st.se
             
             st.download_button(
                 "⬇️ Download Progress",
-                json.dumps(progress_data, indent=2),
+                json.dumps(progress_data, indent=2).encode(),
                 "recruitment_progress.json",
                 "application/json",
                 width='stretch'
@@ -1108,13 +1505,10 @@ Candidates Ready: {len([id for id in st.session_state.shortlisted if id in st.se
     
     with col3:
         if st.button("📊 Download Full Report", width='stretch'):
-            report_df = df.copy()
-            report_df['Status'] = report_df['ID'].apply(get_status)
-            report_df['Contact_Status'] = report_df['ID'].map(lambda x: st.session_state.contact_status.get(x, 'Not Contacted'))
-            report_df['Rating'] = report_df['ID'].map(lambda x: st.session_state.ratings.get(x, 0))
-            report_df['Interview_Date'] = report_df['ID'].map(lambda x: st.session_state.interview_scheduled.get(x, 'Not Scheduled'))
-            
-            csv = report_df.to_csv(index=False)
+            csv = full_report_csv(
+                df, st.session_state.data_key, statuses, st.session_state.contact_status,
+                st.session_state.ratings, st.session_state.interview_scheduled
+            )
             st.download_button(
                 "⬇️ Download CSV",
                 csv,
@@ -1126,10 +1520,11 @@ Candidates Ready: {len([id for id in st.session_state.shortlisted if id in st.se
     with col4:
         if st.button("🆕 Upload New File", width='stretch'):
             st.session_state.df = None
-            st.session_state.shortlisted = set()
-            st.session_state.rejected = set()
+            st.session_state.data_key = None
+            st.session_state.shortlisted = VersionedSet()
+            st.session_state.rejected = VersionedSet()
             st.session_state.remarks = {}
-            st.session_state.contact_status = {}
-            st.session_state.interview_scheduled = {}
-            st.session_state.ratings = {}
+            st.session_state.contact_status = VersionedDict()
+            st.session_state.interview_scheduled = VersionedDict()
+            st.session_state.ratings = VersionedDict()
             st.rerun()
\ No newline at end of file